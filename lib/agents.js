@@ -0,0 +1,23 @@
+var http = require('http');
+var https = require('https');
+
+// As the parsers are constantly talking to the same handful of services
+// (the NSFW scoring engine, the PVS API), we want to keep those connections
+// open and re-use them instead of paying for a new TCP (and TLS) handshake
+// on every single request.
+var httpAgent = new http.Agent({keepAlive: true, maxSockets: 50});
+var httpsAgent = new https.Agent({keepAlive: true, maxSockets: 50});
+
+// Returns the appropriate keep-alive agent for the address given.
+function agentFor(address) {
+	if (address.indexOf('https:') == 0) {
+		return httpsAgent;
+	}
+	return httpAgent;
+}
+
+module.exports = {
+	http: httpAgent,
+	https: httpsAgent,
+	agentFor: agentFor
+}
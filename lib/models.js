@@ -1,12 +1,15 @@
 var Sequelize = require('sequelize');
 var base64Img = require('base64-img');
 var config = require('config');
-var sequelize = new Sequelize(config.Database.uri, {logging: config.Database.logging});
+var sequelize = new Sequelize(config.Database.uri, {
+	logging: config.Database.logging,
+	pool: config.Database.pool
+});
 
 
 var Image = sequelize.define('image', {
 	id: {type: Sequelize.INTEGER, autoIncrement: true, primaryKey: true},
-	hash: Sequelize.STRING(32),
+	hash: {type: Sequelize.STRING(32), unique: true},
 	count: {type: Sequelize.INTEGER, defaultValue: 0},
 	url: Sequelize.STRING,
 	filename: {type: Sequelize.STRING(42), unique: true},
@@ -22,6 +25,7 @@ var Image = sequelize.define('image', {
 
 var Account = sequelize.define('account', {
 	id: {type: Sequelize.INTEGER, autoIncrement: true, primaryKey: true},
+	hash: {type: Sequelize.STRING(32), unique: true},
 	username: Sequelize.STRING,
 	password: Sequelize.STRING,
 	information: Sequelize.STRING,
@@ -35,6 +39,8 @@ var Stat = sequelize.define('stat', {
 	date: {type: Sequelize.DATE, defaultValue: Sequelize.NOW},
 	count: {type: Sequelize.INTEGER, defaultValue: 0},
 	transport: Sequelize.STRING
+},{
+	indexes: [{fields: ['date']}]
 })
 
 var Host = sequelize.define('host', {
@@ -44,10 +50,10 @@ var Host = sequelize.define('host', {
 })
 
 
-Image.sync();
-Account.sync();
-Stat.sync();
-Host.sync();
+// As node caches this module, every parser and the web server share this one
+// sequelize instance (and its connection pool).  We sync all of the models
+// through it in one go.
+sequelize.sync();
 
 
 module.exports = {
@@ -1,13 +1,20 @@
 var spawn = require('child_process').spawn;
 var config = require('config');
 var db = require('../models');
+var agentFor = require('../agents').agentFor;
 var httpreq = require('httpreq');
-var md5File = require('md5');
 var mv = require('mv');
 var fs = require('fs');
+var extname = require('path').extname;
+var crypto = require('crypto');
 var io = require('../web').io;
 
 function driftnetParser() {
+	// The scoring address and the connection agent to use for it never change,
+	// so we will only compute them once.
+	var nsfwAddress = config.NSFW.address + '/score';
+	var nsfwAgent = agentFor(config.NSFW.address);
+
 	// If the temporary path doesn't exist, then lets create it.
 	if (!fs.existsSync(config.Monitoring.Driftnet.tmp)) {
 		fs.mkdirSync(config.Monitoring.Driftnet.tmp);
@@ -23,9 +30,19 @@ function driftnetParser() {
 			image.date = new Date();
 			image.count += 1;
 			io.emit('images', image);
-			console.log('Driftnet: ' + image.filename + ' updated!')
+			if (config.AppServer.debug) {
+				console.log('Driftnet: ' + image.filename + ' updated!')
+			}
+
+			// Instead of writing the whole image object back, we will bump
+			// the counter and timestamp with a single UPDATE.  Incrementing
+			// the counter in the query also means we won't lose counts when
+			// the same image is seen several times at once.
+			db.Image.update({
+				date: image.date,
+				count: db.sequelize.literal('count + 1')
+			}, {where: {id: image.id}});
 		}
-		image.save();
 	}
 
 	// Returns a new driftnet child to work from.
@@ -43,90 +60,100 @@ function driftnetParser() {
 			var filenames = data.toString().split('\n');
 			//var filenames = data.toString().replace(/(\r\n|\n|\r)/gm, '');
 
-			// Next we will attempt to open the file that driftnet
+			// Next we will work through each of the files that driftnet
 			// output the location to.
 			filenames.forEach(function (filename){
 				//var filename = filenames[f];
 				if (filename.length > 4){
 					//console.log('Driftnet: found ' + filename);
-					fs.readFile(filename, function(e, data) {
-						if(e) {console.log('Driftnet: ' + e)} else {
-							// If the file opened correctly, then we will compute
-							// an md5 hash.  The ext regex is designed to get the
-							// file extension from the filename.
-							var hash = md5File(data);
-							var ext = /(?:\.([^.]+))?$/.exec(filename)[1];
-							if (ext == 'jpeg') {
-								ext = 'jpg';
-							}
-							if (ext == 'tiff') {
-								ext = 'tif';
-							}
-							var new_filename = hash + '.' + ext;
+					// Rather than reading the whole image into memory, we will
+					// stream the file through the md5 hasher.  We never need the
+					// image data itself, as the file is simply moved into place.
+					var hasher = crypto.createHash('md5');
+					fs.createReadStream(filename).on('error', function(e) {
+						console.log('Driftnet: ' + e);
+					}).on('data', function(chunk) {
+						hasher.update(chunk);
+					}).on('end', function() {
+						// Once the file has been read, we will compute the md5
+						// hash and pull the file extension from the filename.
+						var hash = hasher.digest('hex');
+						var ext = extname(filename).slice(1);
+						if (ext == 'jpeg') {
+							ext = 'jpg';
+						}
+						if (ext == 'tiff') {
+							ext = 'tif';
+						}
+						var new_filename = hash + '.' + ext;
 
-							// Next we will attempt to move the file to its new home.
-							// If the file already exists, then the move will fail.
-							mv(filename, config.AppServer.images + '/' + new_filename, 
-										 {clobber: false}, function(err){
-								if (err && err.code != 'EEXIST'){
-									console.log('Driftnet: attempt to move ' + filename + ' failed. ' + err);
+						// Next we will attempt to move the file to its new home.
+						// If the file already exists, then the move will fail.
+						mv(filename, config.AppServer.images + '/' + new_filename, 
+									 {clobber: false}, function(err){
+							if (err && err.code != 'EEXIST'){
+								console.log('Driftnet: attempt to move ' + filename + ' failed. ' + err);
+								fs.unlink(filename, function(err){});
+							} else {
+								if (err) {
+									//console.log('Driftnet: ' + hash + ' already exists, so removing duplicate.')
 									fs.unlink(filename, function(err){});
-								} else {
-									if (err) {
-										//console.log('Driftnet: ' + hash + ' already exists, so removing duplicate.')
-										fs.unlink(filename, function(err){});
+								}
+								// Now lets query the database and see if an image exists
+								// with the same md5sum as what we computed.  If there is
+								// an existing image, then we'll increment the counter and
+								// update the date timestamp.  If one doesn't exist, then
+								// we will create a new image with the information we have.
+								db.Image.findOrCreate({where: {hash: hash},
+									defaults: {
+										type: ext,
+										filename: new_filename,
+										url: 'DRIFTNET',
+										count: 1
 									}
-									// Now lets query the database and see if an image exists
-									// with the same md5sum as what we computed.  If there is
-									// an existing image, then we'll increment the counter and
-									// update the date timestamp.  If one doesn't exist, then
-									// we will create a new image with the information we have.
-									db.Image.findOrCreate({where: {hash: hash},
-										defaults: {
-											type: ext,
-											filename: new_filename,
-											url: 'DRIFTNET',
-											count: 1
-										}
-									}).spread(function(image, created) {
-										if (created && config.Monitoring.Driftnet.nsfw_filter) {
-											httpreq.post(config.NSFW.address + '/score', {
-												parameters: {
-													path: 'file:///images/' + image.filename
-												}
-											}, function(err, res) {
-												if (err) {
-													console.log('Driftnet: ' + err);
-												} else {
-													if (res.statusCode == 200){
-														data = JSON.parse(res.body)
-														if (!data['error']){
-															image.updateAttributes({
-																nsfw: data['score']
-															}).then(function(result) {
-																console.log('Driftnet: ' + image.filename + ' created from ' + image.url + ' with nsfw score of ' + image.nsfw)
-																io.emit('images', image)
-															})
-														} else {
-															console.log('Driftnet: Scoring engine errored on ' + image.filename)
+								}).spread(function(image, created) {
+									if (created && config.Monitoring.Driftnet.nsfw_filter) {
+										httpreq.post(nsfwAddress, {
+											agent: nsfwAgent,
+											parameters: {
+												path: 'file:///images/' + image.filename
+											}
+										}, function(err, res) {
+											if (err) {
+												console.log('Driftnet: ' + err);
+											} else {
+												if (res.statusCode == 200){
+													// A reply that isn't valid JSON is treated as a scoring error.
+													var reply = null;
+													try {
+														reply = JSON.parse(res.body);
+													} catch (e) {}
+													if (reply && !reply['error']){
+														image.updateAttributes({
+															nsfw: reply['score']
+														}).then(function(result) {
+															console.log('Driftnet: ' + image.filename + ' created from ' + image.url + ' with nsfw score of ' + image.nsfw)
 															io.emit('images', image)
-														}
+														})
 													} else {
-														console.log('Driftnet: Scoring engine 500d on ' + image.filename)
+														console.log('Driftnet: Scoring engine errored on ' + image.filename)
 														io.emit('images', image)
 													}
+												} else {
+													console.log('Driftnet: Scoring engine 500d on ' + image.filename)
+													io.emit('images', image)
 												}
-											})
-										} else if (created) {
-											console.log('Driftnet: ' + image.filename + ' created from ' + image.url)
-											io.emit('images', image)
-										} else {
-											updateImage(image);
-										}
-									})
-								}
-							})
-						}
+											}
+										})
+									} else if (created) {
+										console.log('Driftnet: ' + image.filename + ' created from ' + image.url)
+										io.emit('images', image)
+									} else {
+										updateImage(image);
+									}
+								})
+							}
+						})
 					});
 				}
 			});
@@ -1,7 +1,5 @@
 var spawn = require('child_process').spawn;
 var config = require('config');
-var Stat = require('../models').Stat;
-var parseXML = require('xml2js').parseString;
 //var io = require('../web').io;
 
 function dsniffParser() {
@@ -1,10 +1,33 @@
 var spawn = require('child_process').spawn;
 var config = require('config');
 var Account = require('../models').Account;
+var UniqueConstraintError = require('sequelize').UniqueConstraintError;
+var crypto = require('crypto');
 var url = require('url');
 var io = require('../web').io;
 
 function ettercapParser() {
+	// These are the regex patterns we check the ettercap output against.  As
+	// they are run against every chunk of output, we only want to build them
+	// once.
+	var rdata = /USER: (.+?)  PASS: (.+?)  INFO: (.*)/m;
+	var rproto = /^(.+?) :/m;
+
+	// Noisy protocols will hand us the same account over and over again.  We
+	// keep the hashes of the most recently seen accounts around so that we
+	// can skip the database entirely for those repeats.  As a Map iterates in
+	// insertion order, the first key is always the oldest one to evict.
+	var seen = new Map();
+	var seenLimit = 4096;
+
+	// Records the account hash as seen, evicting the oldest entry if we are
+	// over the limit.
+	function remember(hash) {
+		seen.set(hash, true);
+		if (seen.size > seenLimit) {
+			seen.delete(seen.keys().next().value);
+		}
+	}
 
 	function run() {
 		console.log('Ettercap: Instantiating dsniff process.')
@@ -15,51 +38,62 @@ function ettercapParser() {
 		child.stdout.on('data', function(data) {
 			// When we get new standard output, we want to check it against a couple of
 			// regex patterns.
-			var rdata = /USER: (.+?)  PASS: (.+?)  INFO: (.*)/gm
-			var rproto = /^(.+?) :/gm
-			var raw = rdata.exec(data.toString());
-			var proto = rproto.exec(data.toString());
+			var entry = data.toString();
+			var raw = rdata.exec(entry);
+			var proto = rproto.exec(entry);
 
 			// If both regex patterns yeidl useful data, then we will attempt to parse
 			// the data into what we are looking for.
 			if (raw && proto) {
 				var username = raw[1];
-				var password = raw[2].slice(0,3) + Array(raw[2].length - 2).join('*');
+				// Only the first 3 characters of the password are kept, with the
+				// rest masked out.  Passwords shorter than that are left as-is.
+				var password = raw[2].slice(0, 3).padEnd(raw[2].length, '*');
 				var information = raw[3];
 				var protocol = proto[1];
 				var dns = url.parse(raw[3]).hostname;
 
-				// Next we will search the database to see if we have seen this specific
-				// account information before.  If we havent, then we will create a
-				// new database object with the information we discovered and then inform
-				// the WebUI of the new data.
-				Account.findOne({
-					where: {
+				// The hash is a fingerprint of the account information and is
+				// stored in a unique column, so that the database itself can tell
+				// us if we have seen this account before.  We simply attempt the
+				// insert and, if it violates the unique constraint, we know the
+				// account is a duplicate and can quietly move on.  This saves us
+				// from having to query the database before every insert.
+				var hash = crypto.createHash('md5')
+					.update([username, password, information, protocol].join('\n'))
+					.digest('hex');
+
+				// If we have seen this account recently, then there is no need to
+				// bother the database with it again.  An account is only remembered
+				// once the database has either stored it or told us it's a duplicate,
+				// so that an account whose insert failed will be retried next time.
+				if (seen.has(hash)) {
+					return;
+				}
+
+				Account.create({
+					hash: hash,
+					username: username,
+					password: password,
+					information: information,
+					parser: 'ettercap',
+					protocol: protocol,
+					dns: dns
+				}).then(function(account) {
+					remember(hash);
+					console.log('Ettercap: Added ' + username + ':' + password + ' account');
+					io.emit('accounts', {
 						username: username,
 						password: password,
 						information: information,
-						protocol: protocol
-					}
-				}).then(function(err, result) {
-					if (!(result)) {
-						Account.create({
-							username: username,
-							password: password,
-							information: information,
-							parser: 'ettercap',
-							protocol: protocol,
-							dns: dns
-						});
-						console.log('Ettercap: Added ' + username + ':' + password + ' account');
-						io.emit('accounts', {
-							username: username,
-							password: password,
-							information: information,
-							parser: 'ettercap',
-							protocol: protocol,
-							dns: dns
-						});
-					}
+						parser: 'ettercap',
+						protocol: protocol,
+						dns: dns
+					});
+				}).catch(UniqueConstraintError, function(err) {
+					remember(hash);
+				}).catch(function(err) {
+					console.log('Ettercap: ' + err);
 				});
 			}
 		})
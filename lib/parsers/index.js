@@ -1,14 +1,11 @@
 var config = require('config');
-var driftnet = require('./driftnet').parser;
-var tshark = require('./tshark').parser;
-var ngrep = require('./ngrep').parser;
-var pvs = require('./pvs').parser;
-var ettercap = require('./ettercap').parser;
 
 // For each parser, if autostart is set to true in the config
-// file, then we will want to fire that parser up.
-if (config.Monitoring.Driftnet.autostart) 	{ driftnet(); }
-if (config.Monitoring.NGrep.autostart) 		{ ngrep(); }
-if (config.Monitoring.TShark.autostart) 	{ tshark(); }
-if (config.Monitoring.PVS.autostart)		{ pvs(); }
-if (config.Monitoring.Ettercap.autostart)	{ ettercap(); }
+// file, then we will want to fire that parser up.  We only load
+// the parsers that are actually enabled, so that we don't pull
+// in the dependencies of parsers that will never be run.
+if (config.Monitoring.Driftnet.autostart) 	{ require('./driftnet').parser(); }
+if (config.Monitoring.NGrep.autostart) 		{ require('./ngrep').parser(); }
+if (config.Monitoring.TShark.autostart) 	{ require('./tshark').parser(); }
+if (config.Monitoring.PVS.autostart)		{ require('./pvs').parser(); }
+if (config.Monitoring.Ettercap.autostart)	{ require('./ettercap').parser(); }
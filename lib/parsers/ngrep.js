@@ -2,29 +2,55 @@ var spawn = require('child_process').spawn;
 var config = require('config');
 var httpreq = require('httpreq');
 var db = require('../models');
-var md5 = require('md5');
+var agentFor = require('../agents').agentFor;
+var crypto = require('crypto');
 var fs = require('fs');
+var extname = require('path').extname;
 var io = require('../web').io;
 
 function ngrepParser() {
+	// The scoring address and the connection agent to use for it never change,
+	// so we will only compute them once.
+	var nsfwAddress = config.NSFW.address + '/score';
+	var nsfwAgent = agentFor(config.NSFW.address);
+
 	function updateImage(image, url) {
 		// As an attempt to make sure that the front-end isn't
 		// getting spammed with the same image over and over,
 		// we will only update the date timestamp (which in
 		// turn will allow it to be refreshed on the webui)
 		// if we haven't seen the image for 10 seconds.
+		//
+		// Instead of writing the whole image object back, we will only
+		// send the changed columns in a single UPDATE.  Incrementing the
+		// counter in the query also means we won't lose counts when the
+		// same image is seen several times at once.
+		var changes = {};
 		if ((new Date().getTime() - image.date.getTime()) >= 1000) {
 			image.date = new Date();
 			image.count += 1;
+			changes.date = image.date;
+			changes.count = db.sequelize.literal('count + 1');
 			io.emit('images', image);
-			console.log('NGrep: ' + image.filename + ' updated!')
+			if (config.AppServer.debug) {
+				console.log('NGrep: ' + image.filename + ' updated!')
+			}
 		}
 		if (!image.url){
 			image.url = url;
+			changes.url = url;
+		}
+		if (Object.keys(changes).length > 0) {
+			db.Image.update(changes, {where: {id: image.id}});
 		}
-		image.save();
 	}
 
+	// These are the regex patterns used to pull the host and the path out
+	// of the header data.  As they are run against every request we see, we
+	// only want to build them once.
+	var rhost = /Host\: (.*)\./m;
+	var rpath = /GET (.*) HTTP/m;
+
 	function run() {
 		// These are the image extensions we will be looking for
 		var imageExtensions = [
@@ -46,17 +72,18 @@ function ngrepParser() {
 
 			// The two peices of information that we want to pull out of the header
 			// data are as follows:  The DNS address and the URL path.
-			var host = /Host\: (.*)\./gm.exec(entry);
-			var path = /GET (.*) HTTP/gm.exec(entry);
+			var host = rhost.exec(entry);
+			var path = rpath.exec(entry);
 
 			// The only reason to continue further is if we were able to properly
 			// extract both a valid host and a path.
 			if (path && host) {
 				// Lets next try to reconstruct the URL and the file extension
 				// from the information we have on hand.
+				var path_nq = path[1].split('?').shift();
 				var url = ('http://' + host[1] + path[1]);
-				var url_nq = ('http://' + host[1] + path[1].split('?').shift());
-				var ext = /(?:\.([^.]+))?$/.exec(path[1].split('?').shift())[1];
+				var url_nq = ('http://' + host[1] + path_nq);
+				var ext = extname(path_nq).slice(1);
 
 				if (ext == 'jpeg') {
 					ext = 'jpg';
@@ -85,7 +112,7 @@ function ngrepParser() {
 									if (err) {
 										console.log('NGrep: download error - ' + err);
 									} else {
-										var hash = md5(res.body);
+										var hash = crypto.createHash('md5').update(res.body).digest('hex');
 										var filename = hash + '.' + ext;
 										// Attempt to write the file...
 										fs.writeFile(config.AppServer.images + '/' + filename, res.body, function(err) {
@@ -102,7 +129,8 @@ function ngrepParser() {
 													}
 												}).spread(function(image, created){
 													if (created && config.Monitoring.NGrep.nsfw_filter) {
-														httpreq.post(config.NSFW.address + '/score', {
+														httpreq.post(nsfwAddress, {
+															agent: nsfwAgent,
 															parameters: {
 																path: 'file:///images/' + filename
 															}
@@ -111,10 +139,14 @@ function ngrepParser() {
 																console.log('NGrep: ' + err);
 															} else {
 																if (res.statusCode == 200){
-																	data = JSON.parse(res.body)
-																	if (!data['error']){
+																	// A reply that isn't valid JSON is treated as a scoring error.
+																	var reply = null;
+																	try {
+																		reply = JSON.parse(res.body);
+																	} catch (e) {}
+																	if (reply && !reply['error']){
 																		image.updateAttributes({
-																			nsfw: data['score']
+																			nsfw: reply['score']
 																		}).then(function(result) {
 																			console.log('NGrep: ' + image.filename + ' created from ' + image.url + ' with nsfw score of ' + image.nsfw)
 																			io.emit('images', image)
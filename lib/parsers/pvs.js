@@ -1,6 +1,7 @@
 var config = require('config');
 var httpreq = require('httpreq');
 var web = require('../web');
+var agent = require('../agents').https;
 
 function pvsParser() {
 	// As the PVS os most likely using a self-signed certificate, we will
@@ -11,11 +12,14 @@ function pvsParser() {
 	// All of the functions will be leveraging the host variable, which
 	// is derrived from the configuration settings.
 	var host = 'https://' + config.Monitoring.PVS.hostname + ':8835';
+	var chartUrl = host + '/chart/data';
 
 	function pvsData() {
 		var token = null;
 		// Initiate the login to the PVS API.
 		httpreq.post(host + '/login', {
+			agent: agent,
+			timeout: config.Monitoring.PVS.timeout,
 			parameters: {
 				login: config.Monitoring.PVS.username,
 				password: config.Monitoring.PVS.password,
@@ -34,7 +38,9 @@ function pvsParser() {
 				// dashboard item.  Since the New PVS WebUI has formatted
 				// most of the data all pretty for us already, we just
 				// need to reformat it for our uses.
-				httpreq.post(host + '/chart/data', {
+				httpreq.post(chartUrl, {
+					agent: agent,
+					timeout: config.Monitoring.PVS.timeout,
 					parameters: {
 						chart_id: 1, 	// Chart 1 is the top hosts chart.
 						start_time: -1,
@@ -94,7 +100,9 @@ function pvsParser() {
 						// dashboard item.  Since the New PVS WebUI has formatted
 						// most of the data all pretty for us already, we just
 						// need to reformat it for our uses.
-						httpreq.post(host + '/chart/data', {
+						httpreq.post(chartUrl, {
+							agent: agent,
+							timeout: config.Monitoring.PVS.timeout,
 							parameters: {
 								chart_id: 2, 	// Chart 2 is the top vulns chart.
 								start_time: -1,
@@ -130,7 +138,11 @@ function pvsParser() {
 
 								// Initiate a logout from the API.  We need to make sure to do
 								// this so that we don't keep sessions running to time out
-								httpreq.post(host + '/logout', {parameters: {json: 1, token: token}})
+								httpreq.post(host + '/logout', {
+									agent: agent,
+									timeout: config.Monitoring.PVS.timeout,
+									parameters: {json: 1, token: token}
+								})
 							}
 						})
 					}
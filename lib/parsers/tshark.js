@@ -6,6 +6,7 @@ var io = require('../web').io;
 
 function tsharkParser() {
 	var transports = {};	// Transport array for maintaining protocol counts.
+	var repkt = /Packets: (\d+)/;	// Packet counter pattern for filtering stderr.
 
 	// As the transports array is keeping state of the current packet counts
 	// for the various transports we have seen, we need to be able to schedule
@@ -26,15 +27,20 @@ function tsharkParser() {
 		console.log('TShark: Initiating Checkpoint for ' + ts);
 
 		// Now we need to iterate through all of the keys in the array and
-		// create a new database entry for each one.
+		// build a database entry for each one.  All of the entries are then
+		// inserted in a single batch instead of one INSERT per transport.
+		var rows = [];
 		for (var key in items){
 			// console.log('TShark: Checkpointing ' + key + ' at ' + items[key])
-			Stat.create({
+			rows.push({
 				transport: key,
 				count: items[key],
 				date: ts
 			});
 		}
+		if (rows.length > 0) {
+			Stat.bulkCreate(rows);
+		}
 		io.emit('protocols', 'refresh');
 	}, 60000);	// 60 second timer.
 
@@ -122,9 +128,9 @@ function tsharkParser() {
 			// the console log.  We still want all other standard error entries to hit the
 			// console log however, so a simple regex check to filter out the spammy data
 			// should be all we need.
-			var repkt = /Packets: (\d+)/g;
-			if (!(repkt.exec(data.toString()))){
-				console.log('TShark: (stderr): ' + data.toString().replace(/(\r\n|\n|\r)/gm, ' '));
+			var entry = data.toString();
+			if (!(repkt.test(entry))){
+				console.log('TShark: (stderr): ' + entry.replace(/(\r\n|\n|\r)/gm, ' '));
 			}
 		})
 
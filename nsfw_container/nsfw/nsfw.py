@@ -1,10 +1,9 @@
-import requests, numpy, os, sys, glob, time, caffe
-from PIL import Image
+import requests, numpy, caffe
 from requests_file import FileAdapter
 #from flask_redis import FlaskRedis
 from flask import Flask, request, jsonify
 from PIL import Image
-from StringIO import StringIO
+from io import BytesIO
 
 
 s = requests.Session()
@@ -38,10 +37,10 @@ def resize_image(image):
 	if image.mode != 'RGB':
 		image = image.convert('RGB')
 
-	# Now lets resize the image and save it into a StringIO buffer
+	# Now lets resize the image and save it into a BytesIO buffer
 	# as a JPEG image.
 	rimg = image.resize((256, 256), resample=Image.BILINEAR)
-	resp = StringIO()
+	resp = BytesIO()
 	rimg.save(resp, format='JPEG')
 
 	# Return the byte array of the image.
@@ -57,13 +56,13 @@ def compute_nsfw_score(image_data):
 	
 	# Lets resize the image and load the image into Caffe
 	rimg = resize_image(image_data)
-	img = caffe.io.load_image(StringIO(rimg))
+	img = caffe.io.load_image(BytesIO(rimg))
 
 	# Now we will want to crop the image down.
 	H, W, _ = img.shape
 	_, _, h, w = network.blobs['data'].data.shape
-	h_off = max((H - h) /2, 0)
-	w_off = max((W - w) /2, 0)
+	h_off = max((H - h) // 2, 0)
+	w_off = max((W - w) // 2, 0)
 	crop = img[h_off:h_off + h, w_off:w_off + w, :]
 
 	# Now lets transform the image
@@ -85,14 +84,27 @@ def get_score():
 		image = Image.open(request.files['image'])
 	elif 'path' in request.form:
 		resp = s.get(request.form.get('path'), stream=True)
-		if resp.status_code == 200:
-			resp.raw.decode_content = True
-			image = Image.open(resp.raw)
+		try:
+			if resp.status_code == 200:
+				resp.raw.decode_content = True
+
+				# As PIL reads the image lazily, we need to load it in now
+				# while the stream is still open.  If the image can't be
+				# decoded, we leave image unset and return the error below.
+				try:
+					image = Image.open(resp.raw)
+					image.load()
+				except Exception:
+					image = None
+		finally:
+			# A streamed response holds onto the file handle until it is
+			# closed, so we need to make sure we close it ourselves.
+			resp.close()
 
 	if image:
 		try:
 			score = compute_nsfw_score(image)
-		except:
+		except Exception:
 			return jsonify({'score': None, 'error': True})
 		else:
 			return jsonify({'score': score, 'error': False})